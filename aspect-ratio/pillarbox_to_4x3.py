@@ -4,13 +4,16 @@ pillarbox_to_4x3.py — Auto-crop pillarboxed 16:9 videos back to 4:3.
 
 Requirements:
   - ffmpeg and ffprobe available in PATH
+  - optional: PyAV (`pip install av`) for the in-process --pyav encoder
 
 What it does:
   - Probes the input to get width/height, video codec, bitrate, etc.
   - Computes a centered crop to 4:3 (width = round(height * 4/3)) or
     optionally uses ffmpeg's cropdetect to find precise bars.
   - Re-encodes VIDEO with the *same codec family* (e.g., h264 -> libx264,
-    hevc -> libx265, vp9 -> libvpx-vp9, etc.).
+    hevc -> libx265, vp9 -> libvpx-vp9, etc.). With --bitstream-crop,
+    block-aligned H.264/HEVC crops skip the re-encode and just rewrite the
+    stream's cropping window.
   - Targets roughly the same bitrate as the source by default (good quality
     parity without needing to guess CRF).
   - Copies ALL other streams as-is: audio, subtitles, data, attachments.
@@ -22,78 +25,217 @@ Usage:
 
 Nice options:
   --use-cropdetect      Run a short cropdetect scan to find exact bars
+                        (skipped for exact 16:9 or ~4:3 inputs, where the
+                        centered crop is already exact)
   --scan-seconds N      Seconds to scan for cropdetect (default 15)
+  --cropdetect-skip N   Seconds to skip before scanning (default 10). Intros
+                        and logos often carry different bars; skipping too
+                        far can miss the programme on short clips (clips
+                        shorter than N are scanned from the start). Only
+                        keyframes are sampled, so a 15 s window may give
+                        just a few samples to vote on; raise --scan-seconds
+                        for a steadier mode (too few samples triggers a
+                        slower full-frame rescan)
   --crf                 Use CRF mode instead of bitrate (e.g. --crf 18)
-  --preset PRESET       ffmpeg encoder preset (default 'medium')
+  --preset PRESET       ffmpeg encoder preset (default 'faster'; for AV1 a
+                        number is passed as -cpu-used)
+  --two-pass            Two-pass encode when targeting the source bitrate
+  --pyav                Encode in-process via PyAV instead of spawning ffmpeg
+                        per file. Only for inputs with just video+audio and
+                        no chapters; anything else, plus --hwaccel and
+                        --two-pass encodes, still goes through ffmpeg
+  --tune TUNE           x264/x265 tuning (e.g. ssim, film, animation)
   --output, -o DIR      Output directory (default: alongside input)
+  --hwaccel MODE        none|cuda|qsv|videotoolbox|auto — hardware decode,
+                        crop and encode (NVENC/QSV/VideoToolbox) when the
+                        matching encoder is available (default none)
+  --jobs, -j N          Process N files concurrently (default 1)
+  --encode-threads N    Threads per encoder (default: CPU count / jobs)
+  --bitstream-crop      For H.264/HEVC crops that fall on macroblock/CTU
+                        boundaries (16/64 px, e.g. 1920x1080 -> 1440x1080),
+                        skip the re-encode and rewrite the stream's cropping
+                        window instead. Lossless and remux-fast, but the
+                        container still records the original size, so
+                        players that size from it (QuickTime/AVFoundation)
+                        show the picture stretched. Ignored when --crf,
+                        --two-pass, --hwaccel or --pyav ask for an encode
   --dry-run             Print the ffmpeg command but don’t run it
 """
 
 import argparse
+import functools
 import json
 import math
 import os
+import re
+import selectors
 import shlex
 import shutil
 import subprocess
+import tempfile
 import threading
 import sys
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-# Map input codec names (as seen in ffprobe) to sane encoders
+try:
+    import av  # optional: in-process encode for --pyav
+except ImportError:
+    av = None
+
+# Map input codec names (as seen in ffprobe) to sane encoders, per --hwaccel
+# tier. "cpu" is the software encoder and is always present.
 CODEC_MAP = {
-    "h264": "libx264",
-    "hevc": "libx265",
-    "mpeg4": "mpeg4",
-    "mpeg2video": "mpeg2video",
-    "vp9": "libvpx-vp9",
-    "av1": "libaom-av1",
-    "theora": "libtheora",
-    "prores": "prores_ks",
-    "h263": "h263",
+    "h264": {"cpu": "libx264", "cuda": "h264_nvenc", "qsv": "h264_qsv",
+             "videotoolbox": "h264_videotoolbox"},
+    "hevc": {"cpu": "libx265", "cuda": "hevc_nvenc", "qsv": "hevc_qsv",
+             "videotoolbox": "hevc_videotoolbox"},
+    "mpeg4": {"cpu": "mpeg4"},
+    "mpeg2video": {"cpu": "mpeg2video"},
+    "vp9": {"cpu": "libvpx-vp9"},
+    "av1": {"cpu": "libaom-av1", "cuda": "av1_nvenc", "qsv": "av1_qsv"},
+    "theora": {"cpu": "libtheora"},
+    "prores": {"cpu": "prores_ks"},
+    "h263": {"cpu": "h263"},
+}
+
+# cropdetect's suggestion as printed on each analysed frame. A single group
+# gives one flat b"w:h:x:y" key per match, cheaper to hash than a tuple.
+CROP_RE = re.compile(rb"crop=(\d+:\d+:\d+:\d+)")
+
+# ffmpeg logging: progress + detailed info when running one file at a time;
+# errors only plus machine-readable progress on stdout under --jobs
+LOG_FLAGS = ["-stats", "-loglevel", "level+info"]
+QUIET_LOG_FLAGS = ["-nostats", "-loglevel", "error", "-progress", "pipe:1"]
+
+# Fewest cropdetect suggestions a keyframe-only scan must yield before we
+# trust its mode; below this the window is rescanned decoding every frame
+CROPDETECT_MIN_SAMPLES = 5
+
+# Coded block size per codec. Crops whose edges all land on it can be applied
+# losslessly by rewriting the SPS/conformance cropping window instead of
+# re-encoding pixels.
+BITSTREAM_CROP_UNIT = {"h264": 16, "hevc": 64}
+
+# Order tried by --hwaccel auto
+HWACCEL_ORDER = ("cuda", "qsv", "videotoolbox")
+
+# nvenc only understands p1..p7; map the x264-style names onto them
+NVENC_PRESETS = {
+    "ultrafast": "p1", "superfast": "p1", "veryfast": "p2", "faster": "p3",
+    "fast": "p4", "medium": "p5", "slow": "p6", "slower": "p7", "veryslow": "p7",
 }
 
-def run(cmd):
-    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+def run(cmd, text=True):
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=text)
     return proc.returncode, proc.stdout, proc.stderr
 
-def run_live_capture(cmd):
+def parse_progress(text):
+    """Fold ffmpeg `-progress` key=value lines into a dict of the latest values."""
+    progress = {}
+    for ln in text.splitlines():
+        key, sep, value = ln.partition("=")
+        if sep:
+            progress[key.strip()] = value.strip()
+    return progress
+
+def run_live_capture(cmd, quiet=False):
     """
     Run a command (ffmpeg) and:
       - stream stdout/stderr live to the user's terminal
       - capture both into strings for later use
     Returns (returncode, captured_stdout, captured_stderr).
+
+    With quiet=True nothing is echoed: stdout is treated as `-progress pipe:1`
+    output and only its latest key=value state is kept (returned as the
+    stdout string), while stderr is captured for error reporting. Pair it
+    with `-loglevel error` so stderr stays small.
+
+    Both pipes are drained from this thread with a selector, in raw chunks.
+    Windows can't select() on pipes, so there we fall back to one reader
+    thread per pipe.
     """
-    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1)
+    sys.stdout.flush(); sys.stderr.flush()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
-    out_lines, err_lines = [], []
+    out_buf, err_buf = bytearray(), bytearray()
+    sinks = {
+        proc.stdout.fileno(): (sys.stdout.buffer, out_buf),
+        proc.stderr.fileno(): (sys.stderr.buffer, err_buf),
+    }
+    progress = {}
 
-    def pump(src, sink, store):
-        for line in src:
-            sink.write(line)
+    def forward(fd, data):
+        sink, store = sinks[fd]
+        if not quiet:
+            sink.write(data)
             sink.flush()
-            store.append(line)
+            store.extend(data)
+        elif store is out_buf:
+            # Keep only the trailing partial line; fold complete ones
+            store.extend(data)
+            head, sep, tail = store.rpartition(b"\n")
+            if sep:
+                progress.update(parse_progress(head.decode("utf-8", "replace")))
+                store[:] = tail
+        else:
+            store.extend(data)
+
+    if os.name == "nt":
+        def pump(fd):
+            while True:
+                data = os.read(fd, 65536)
+                if not data:
+                    break
+                forward(fd, data)
 
-    t_out = threading.Thread(target=pump, args=(proc.stdout, sys.stdout, out_lines), daemon=True)
-    t_err = threading.Thread(target=pump, args=(proc.stderr, sys.stderr, err_lines), daemon=True)
-    t_out.start(); t_err.start()
+        threads = [threading.Thread(target=pump, args=(fd,), daemon=True) for fd in sinks]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    else:
+        with selectors.DefaultSelector() as sel:
+            for fd in sinks:
+                sel.register(fd, selectors.EVENT_READ)
+            while sel.get_map():
+                for key, _ in sel.select():
+                    data = os.read(key.fd, 65536)
+                    if not data:
+                        sel.unregister(key.fd)
+                        continue
+                    forward(key.fd, data)
 
     rc = proc.wait()
-    t_out.join(); t_err.join()
+    proc.stdout.close(); proc.stderr.close()
 
-    return rc, "".join(out_lines), "".join(err_lines)
+    if quiet:
+        progress.update(parse_progress(out_buf.decode("utf-8", "replace")))
+        out = "".join(f"{k}={v}\n" for k, v in progress.items())
+    else:
+        out = out_buf.decode("utf-8", "replace")
+    return rc, out, err_buf.decode("utf-8", "replace")
 
-def ffprobe_json(path):
+@functools.lru_cache(maxsize=256)
+def _ffprobe_cached(path, mtime_ns, size):
+    # mtime/size are part of the cache key so a changed file gets re-probed
     cmd = [
         "ffprobe", "-v", "error", "-print_format", "json",
-        "-show_streams", "-show_format", str(path)
+        "-select_streams", "v:0",
+        "-show_streams", "-show_format", "-show_chapters", path
     ]
-    rc, out, err = run(cmd)
+    rc, out, err = run(cmd, text=False)
     if rc != 0:
-        raise RuntimeError(f"ffprobe failed for {path}:\n{err}")
+        raise RuntimeError(f"ffprobe failed for {path}:\n{err.decode('utf-8', 'replace')}")
+    # json.loads takes the raw bytes; no intermediate str decode needed
     return json.loads(out)
 
+def ffprobe_json_video(path):
+    """Probe `path`, reporting only the first video stream (plus format and chapters)."""
+    st = os.stat(path)
+    return _ffprobe_cached(str(path), st.st_mtime_ns, st.st_size)
+
 def get_video_stream(info):
     for s in info.get("streams", []):
         if s.get("codec_type") == "video":
@@ -106,6 +248,12 @@ def parse_int(x, default=None):
     except (TypeError, ValueError):
         return default
 
+def parse_float(x, default=None):
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return default
+
 def even(n):
     # Ensure the number is even (encoders often require mod2 dimensions)
     return int(n) - (int(n) % 2)
@@ -119,204 +267,773 @@ def centered_4x3_crop(iw, ih):
     y = even((ih - target_h) // 2)  # usually 0, but keep centered for safety
     return target_w, target_h, x, y
 
-def run_cropdetect(path, seconds=15):
+def run_cropdetect(path, seconds=15, start=0):
     """
     Run a short cropdetect scan and return the *mode* crop (w,h,x,y) if found.
     We bias toward a 4:3 width if it's very close.
+
+    Only keyframes are decoded (bars don't change between them) and audio,
+    subtitle and data streams are ignored, so the scan is cheap. `start`
+    seeks past titles/black frames before scanning. With long GOPs the
+    window may hold only a keyframe or two; if that yields fewer than
+    CROPDETECT_MIN_SAMPLES suggestions the window is rescanned decoding
+    every frame.
+
+    cropdetect is reset on every analysed frame, so each scene reports its
+    own bars instead of the running union, and the mode picks the dominant
+    one. Intros/outros with different bars no longer skew the result. The
+    price is that each frame is one vote, so the mode is only as reliable
+    as the number of frames sampled (hence skip=0 and the rescan below).
     """
-    cmd = [
-        "ffmpeg", "-hide_banner", "-ss", "0", "-t", str(seconds),
-        "-i", str(path),
-        "-vf", "cropdetect=24:16:0",
-        "-f", "null", "-"
-    ]
-    rc, out, err = run(cmd)
-    # cropdetect prints to stderr
-    lines = (out + "\n" + err).splitlines()
-    crops = []
-    for ln in lines:
-        # look for 'crop=w:h:x:y'
-        if "crop=" in ln:
-            try:
-                frag = ln.split("crop=")[1].split()[0]
-                w, h, x, y = frag.split(":")
-                crops.append((int(w), int(h), int(x), int(y)))
-            except Exception:
-                pass
+    def scan(keyframes_only):
+        cmd = ["ffmpeg", "-hide_banner", "-hwaccel", "auto"]
+        if keyframes_only:
+            cmd += ["-skip_frame", "nokey"]
+        cmd += [
+            "-ss", str(start), "-t", str(seconds),
+            "-i", str(path),
+            "-an", "-sn", "-dn",
+            # skip=0: cropdetect otherwise ignores the first 2 frames it sees,
+            # which may be every keyframe in the window
+            "-vf", "cropdetect=limit=24:round=16:reset_count=1:skip=0",
+            "-vsync", "vfr",
+            "-f", "null", "-"
+        ]
+        rc, out, err = run(cmd, text=False)
+        if rc != 0:
+            # Unreadable input, bad seek, etc.: suggestions from a failed run
+            # can't be trusted, so the caller falls back to the centered crop
+            tail = err.decode(errors="replace").strip().splitlines()[-3:]
+            print(f"!! Note: cropdetect failed ({rc}) for {path}; falling back.\n" + "\n".join(tail),
+                  file=sys.stderr)
+            return None
+        # cropdetect prints 'crop=w:h:x:y' to stderr; scan the raw bytes in one go
+        return CROP_RE.findall(out + b"\n" + err)
+
+    crops = scan(keyframes_only=True)
+    if crops is not None and len(crops) < CROPDETECT_MIN_SAMPLES:
+        crops = scan(keyframes_only=False)
     if not crops:
         return None
 
-    # Pick the most frequent crop suggestion
+    # Pick the most frequent crop suggestion; only the winner gets int()-parsed.
+    # Counter tallies via C (_count_elements) over flat bytes keys, so even
+    # hours-long scans (keyframes only) don't need a numpy/numba mode-finder:
+    # building an int array would cost more than the counting it replaces.
     mode = Counter(crops).most_common(1)[0][0]
-    w, h, x, y = mode
+    w, h, x, y = (int(n) for n in mode.split(b":"))
     # Ensure even numbers
     return even(w), even(h), even(x), even(y)
 
-def choose_encoder(codec_name):
-    enc = CODEC_MAP.get(codec_name)
-    if enc is None:
+def is_noop_crop(crop, iw, ih):
+    """True if `crop` only trims even()-rounding slack off a full frame."""
+    crop_w, crop_h, x, y = crop
+    return crop_w >= iw - 2 and x == 0 and crop_h >= ih - 2 and y == 0
+
+def bitstream_crop_filter(codec_name, crop, iw, ih):
+    """
+    Return an h264_metadata/hevc_metadata bitstream filter applying `crop`,
+    or None if the codec isn't supported or the crop isn't block-aligned.
+    """
+    unit = BITSTREAM_CROP_UNIT.get(codec_name)
+    if unit is None:
+        return None
+    crop_w, crop_h, x, y = crop
+    edges = {
+        "crop_left": x,
+        "crop_right": iw - x - crop_w,
+        "crop_top": y,
+        "crop_bottom": ih - y - crop_h,
+    }
+    if any(v % unit for v in edges.values()):
+        return None
+    # Only set the edges we trim: e.g. 1080p H.264 is coded as 1088 lines
+    # with an existing bottom crop that has to be kept
+    opts = ":".join(f"{k}={v}" for k, v in edges.items() if v)
+    return f"{codec_name}_metadata={opts}"
+
+def is_analytic_crop_safe(iw, ih):
+    """
+    True when the centered 4:3 crop can be computed without scanning:
+    the source is already ~4:3, or it's exactly 16:9 with a 4:3 width
+    that comes out as a whole number.
+    """
+    if not ih:
+        return False
+    if abs((iw / ih) - (4/3)) <= 0.005:
+        return True
+    return iw * 9 == ih * 16 and (ih * 4) % 3 == 0
+
+@functools.lru_cache(maxsize=2)
+def _ffmpeg_codecs(kind):
+    """
+    Names listed by `ffmpeg -encoders` or `ffmpeg -decoders` (kind), probed
+    once per run.
+    """
+    rc, out, err = run(["ffmpeg", "-hide_banner", f"-{kind}"])
+    if rc != 0:
+        return frozenset()
+    names = set()
+    in_table = False
+    for ln in out.splitlines():
+        # The capability legend comes first, then a '------' separator
+        if ln.strip().startswith("---"):
+            in_table = True
+            continue
+        parts = ln.split()
+        if in_table and len(parts) >= 2:
+            names.add(parts[1])
+    return frozenset(names)
+
+def has_encoder(name):
+    return name in _ffmpeg_codecs("encoders")
+
+def choose_encoder(codec_name, hwaccel="none", constant_quality=False):
+    """
+    Return (encoder, accel) for the source codec. accel is "cpu" or the
+    hardware tier actually picked; tiers whose encoder isn't built into this
+    ffmpeg are skipped silently. If the software encoder itself is missing
+    (e.g. an ffmpeg built without libx265), any usable hardware tier is
+    tried before giving up.
+    """
+    tiers = CODEC_MAP.get(codec_name)
+    if tiers is None:
         # Fallback: try to use the same name (may work for some codecs)
-        return codec_name
-    return enc
+        return codec_name, "cpu"
+
+    def usable(accel):
+        enc = tiers.get(accel)
+        if enc is None or not has_encoder(enc):
+            return None
+        # VideoToolbox has no CRF equivalent; only use it for bitrate targets
+        if accel == "videotoolbox" and constant_quality:
+            return None
+        # GPU-side cropping goes through the matching cuvid decoder
+        if accel == "cuda" and f"{codec_name}_cuvid" not in _ffmpeg_codecs("decoders"):
+            return None
+        return enc
+
+    if hwaccel == "auto":
+        candidates = HWACCEL_ORDER
+    elif hwaccel in (None, "none"):
+        candidates = ()
+    else:
+        candidates = (hwaccel,)
+
+    for accel in candidates:
+        enc = usable(accel)
+        if enc:
+            return enc, accel
+
+    if not has_encoder(tiers["cpu"]):
+        for accel in HWACCEL_ORDER:
+            enc = usable(accel)
+            if enc:
+                print(f"!! Note: {tiers['cpu']} is not available in this ffmpeg; using {enc}.",
+                      file=sys.stderr)
+                return enc, accel
+    return tiers["cpu"], "cpu"
+
+def hwaccel_flags(accel, crop, src_codec=None, src_size=None):
+    """
+    Return (input_flags, video_filter) that apply `crop` for the given tier.
+    For cuda/qsv the frames stay on the GPU from decode through encode.
+    """
+    crop_w, crop_h, x, y = crop
+    if accel == "cuda":
+        iw, ih = src_size
+        # cuvid crops while decoding: top x bottom x left x right
+        return [
+            "-hwaccel", "cuda", "-hwaccel_output_format", "cuda",
+            "-c:v:0", f"{src_codec}_cuvid",
+            "-crop", f"{y}x{ih - y - crop_h}x{x}x{iw - x - crop_w}",
+        ], None
+    if accel == "qsv":
+        return [
+            "-hwaccel", "qsv", "-hwaccel_output_format", "qsv",
+        ], f"vpp_qsv=cx={x}:cy={y}:cw={crop_w}:ch={crop_h}"
+    if accel == "videotoolbox":
+        # Decoded frames come back to system memory for the software crop
+        return ["-hwaccel", "videotoolbox"], f"crop={crop_w}:{crop_h}:{x}:{y}"
+    return [], f"crop={crop_w}:{crop_h}:{x}:{y}"
 
 def output_path_for(input_path, outdir):
-    p = Path(input_path)
-    stem = p.stem
+    """
+    Output path alongside the input, or in `outdir` (already resolved once
+    by main()). Plain os.path string ops: no Path objects per file.
+    """
+    src = str(input_path)
+    base, ext = os.path.splitext(os.path.basename(src))
     # Add tag to make it obvious it’s cropped
-    return Path(outdir or p.parent, f"{stem}.4x3{p.suffix}")
+    return os.path.join(outdir or os.path.dirname(src), f"{base}.4x3{ext}")
+
+class EncoderProfile:
+    """
+    Builds the encoder-specific part of the ffmpeg command. The base class
+    covers plain ffmpeg encoders; subclasses override what differs.
+    """
+    # CRF used when there's neither a source bitrate nor --crf
+    fallback_crf = "28"
+    # Whether --two-pass applies (via ffmpeg's -pass/-passlogfile)
+    supports_two_pass = False
+
+    def __init__(self, fallback_crf=None):
+        if fallback_crf is not None:
+            self.fallback_crf = fallback_crf
+
+    def preset_flags(self, preset):
+        return ["-preset", preset]
+
+    def tune_flags(self, tune):
+        return []
+
+    def encoder_flags(self, threads=None, pass_num=None, passlogfile=None):
+        """Threading and, for two-pass encodes, pass selection flags."""
+        flags = []
+        if threads is not None:
+            flags += ["-threads", str(threads)]
+        if pass_num is not None:
+            flags += ["-pass", str(pass_num), "-passlogfile", passlogfile]
+        return flags
+
+    def quality_flags(self, crf, v_bitrate):
+        if crf is None and v_bitrate is not None and v_bitrate > 0:
+            # Bitrate-based (approx. “same quality” as source)
+            # Give encoder some headroom
+            return ["-b:v", str(v_bitrate), "-maxrate", str(v_bitrate), "-bufsize", str(int(v_bitrate)*2)]
+        # CRF mode (constant quality), or a sensible fallback CRF when no
+        # bitrate was found
+        return self.constant_quality_flags(str(self.fallback_crf if crf is None else crf))
+
+    def constant_quality_flags(self, crf):
+        return ["-crf", crf]
+
+class X264Profile(EncoderProfile):
+    fallback_crf = "18"
+    supports_two_pass = True
+    params_flag = "-x264-params"
+
+    def tune_flags(self, tune):
+        return ["-tune", tune] if tune else []
+
+    def library_params(self, threads, pass_num, passlogfile):
+        if threads is None:
+            return {}
+        return {"threads": threads, "lookahead-threads": max(1, threads // 4)}
+
+    def encoder_flags(self, threads=None, pass_num=None, passlogfile=None):
+        # Size threading explicitly: x264's own default under-fills many-core
+        # machines, and concurrent jobs must not oversubscribe
+        flags = super().encoder_flags(threads=threads)
+        params = self.library_params(threads, pass_num, passlogfile)
+        if pass_num is not None:
+            flags += self.pass_flags(pass_num, passlogfile)
+        if params:
+            flags += [self.params_flag, ":".join(f"{k}={v}" for k, v in params.items())]
+        return flags
+
+    def pass_flags(self, pass_num, passlogfile):
+        return ["-pass", str(pass_num), "-passlogfile", passlogfile]
+
+class X265Profile(X264Profile):
+    params_flag = "-x265-params"
+
+    def library_params(self, threads, pass_num, passlogfile):
+        params = {}
+        if threads is not None:
+            params.update({"pools": threads, "frame-threads": min(threads, 16)})
+        if pass_num is not None:
+            # libx265 ignores -pass; it takes pass/stats through x265-params,
+            # where ':' separates options and must be escaped (Windows drives)
+            params["pass"] = pass_num
+            params["stats"] = passlogfile.replace("\\", "/").replace(":", "\\:")
+        return params
+
+    def pass_flags(self, pass_num, passlogfile):
+        return []
+
+class VpxProfile(EncoderProfile):
+    supports_two_pass = True
+
+    def constant_quality_flags(self, crf):
+        # VP9/AV1 need -b:v 0 for true constant quality
+        return ["-crf", crf, "-b:v", "0"]
+
+class AomProfile(VpxProfile):
+    def preset_flags(self, preset):
+        # libaom-av1 has no named presets, only -cpu-used 0..8; numeric
+        # presets pass through and our default 'faster' maps to the fastest
+        if preset.isdigit():
+            return ["-cpu-used", preset]
+        if preset == "faster":
+            return ["-cpu-used", "8"]
+        return []
+
+class NvencProfile(EncoderProfile):
+    def preset_flags(self, preset):
+        return ["-preset", NVENC_PRESETS.get(preset, preset)]
+
+    def constant_quality_flags(self, crf):
+        return ["-rc", "vbr", "-cq", crf, "-b:v", "0"]
+
+class QsvProfile(EncoderProfile):
+    def constant_quality_flags(self, crf):
+        return ["-global_quality", crf]
+
+class VideoToolboxProfile(EncoderProfile):
+    def preset_flags(self, preset):
+        return []
+
+ENCODER_PROFILES = {
+    "libx264": X264Profile(),
+    "libx265": X265Profile(),
+    "libvpx-vp9": VpxProfile(),
+    "libaom-av1": AomProfile(),
+    "h264_nvenc": NvencProfile("18"),
+    "hevc_nvenc": NvencProfile("18"),
+    "av1_nvenc": NvencProfile(),
+    "h264_qsv": QsvProfile("18"),
+    "hevc_qsv": QsvProfile("18"),
+    "av1_qsv": QsvProfile(),
+    "h264_videotoolbox": VideoToolboxProfile("18"),
+    "hevc_videotoolbox": VideoToolboxProfile("18"),
+}
+
+def build_copy_cmd(src, dst, video_bsf=None, quiet=False):
+    """
+    Remux every stream unchanged (used when there is nothing to crop).
+    `video_bsf` optionally runs a bitstream filter on the first video stream.
+    """
+    cmd = [
+        "ffmpeg", *(QUIET_LOG_FLAGS if quiet else LOG_FLAGS), "-y", "-i", str(src),
+        "-map", "0", "-map_metadata", "0", "-map_chapters", "0",
+        "-c", "copy",
+    ]
+    if video_bsf is not None:
+        cmd += ["-bsf:v:0", video_bsf]
+    cmd += ["-movflags", "use_metadata_tags+faststart", str(dst)]
+    return cmd
 
 def build_ffmpeg_cmd(
-    src, dst, crop, v_encoder, v_bitrate=None, crf=None, preset="medium"
+    src, dst, crop, v_encoder, v_bitrate=None, crf=None, preset="faster", tune=None, threads=None,
+    accel="cpu", src_codec=None, src_size=None, quiet=False, pass_num=None, passlogfile=None,
 ):
-    crop_w, crop_h, x, y = crop
-    vf = f"crop={crop_w}:{crop_h}:{x}:{y}"
+    """
+    Build the crop + re-encode command. For two-pass bitrate encodes pass
+    pass_num=1 (analysis only, output discarded) then pass_num=2 with the
+    same passlogfile.
+    """
+    in_flags, vf = hwaccel_flags(accel, crop, src_codec=src_codec, src_size=src_size)
 
-    # Base mapping: map EVERYTHING from input (all streams)
-    # - Copy non-video streams as-is
     cmd = [
-        "ffmpeg", 
-        "-stats", "-loglevel", "level+info",  # progress + detailed info
-        "-y", "-i", str(src),
-        "-map", "0",
-        "-map_metadata", "0",
-        "-map_chapters", "0",
-        "-c:a", "copy",
-        "-c:s", "copy",
-        "-c:d", "copy",
-        "-c:t", "copy",   # attachments where applicable (mkv)
-        "-c:v", v_encoder,
-        "-vf", vf,
-        "-preset", preset,
+        "ffmpeg",
+        *(QUIET_LOG_FLAGS if quiet else LOG_FLAGS),
+        "-y", *in_flags, "-i", str(src),
     ]
-
-    # Choose quality mode:
-    if crf is not None:
-        # CRF mode (constant quality)
-        cmd += ["-crf", str(crf)]
-        # For VP9/AV1 we should supply -b:v 0 for "constant quality"
-        if v_encoder in ("libvpx-vp9", "libaom-av1"):
-            cmd += ["-b:v", "0"]
-    elif v_bitrate is not None and v_bitrate > 0:
-        # Bitrate-based (approx. “same quality” as source)
-        # Give encoder some headroom
-        cmd += ["-b:v", str(v_bitrate), "-maxrate", str(v_bitrate), "-bufsize", str(int(v_bitrate)*2)]
+    if pass_num == 1:
+        # First pass only needs the video being analysed
+        cmd += ["-map", "0:v:0", "-an", "-sn", "-dn"]
     else:
-        # No bitrate found and no CRF requested — fall back to a sensible CRF
-        fallback_crf = "18" if v_encoder in ("libx264", "libx265") else "28"
-        cmd += ["-crf", fallback_crf]
-        if v_encoder in ("libvpx-vp9", "libaom-av1"):
-            cmd += ["-b:v", "0"]
+        # Base mapping: map EVERYTHING from input (all streams)
+        # - Copy non-video streams as-is
+        cmd += [
+            "-map", "0",
+            "-map_metadata", "0",
+            "-map_chapters", "0",
+            "-c:a", "copy",
+            "-c:s", "copy",
+            "-c:d", "copy",
+            "-c:t", "copy",   # attachments where applicable (mkv)
+        ]
+    cmd += ["-c:v", v_encoder]
+    if vf is not None:
+        cmd += ["-vf", vf]
+    profile = ENCODER_PROFILES.get(v_encoder, EncoderProfile())
+    cmd += profile.preset_flags(preset)
+    cmd += profile.tune_flags(tune)
+    cmd += profile.encoder_flags(threads=threads, pass_num=pass_num, passlogfile=passlogfile)
+    cmd += profile.quality_flags(crf, v_bitrate)
+
+    if pass_num == 1:
+        return cmd + ["-f", "null", os.devnull]
 
     # Preserve container metadata tags behavior and faststart for mp4/mov
     cmd += ["-movflags", "use_metadata_tags+faststart", str(dst)]
     return cmd
 
+def flags_to_codec_options(flags):
+    """
+    Turn encoder CLI flag pairs (as built by an EncoderProfile) into the
+    libavcodec options dict PyAV passes to the encoder: "-b:v" -> "b",
+    "-x264-params" -> "x264-params", and so on.
+    """
+    return {
+        flag.lstrip("-").split(":")[0]: value
+        for flag, value in zip(flags[::2], flags[1::2])
+    }
+
+def encode_with_pyav(src, dst, crop, v_encoder, v_bitrate=None, crf=None, preset="faster", tune=None,
+                     threads=None):
+    """
+    Crop + re-encode in-process through PyAV's libav bindings instead of
+    spawning ffmpeg, avoiding per-file process startup (slow on Windows).
+    Audio is copied packet-for-packet and container tags are kept.
+
+    Returns False without writing anything when the input has streams this
+    path can't carry over (subtitles, data, attachments, extra video);
+    the caller then falls back to the ffmpeg subprocess. PyAV can't write
+    chapters either, so the caller keeps inputs with chapters off this path.
+    """
+    crop_w, crop_h, x, y = crop
+    with av.open(str(src)) as inp:
+        if len(inp.streams.video) != 1 or len(inp.streams) != 1 + len(inp.streams.audio):
+            return False
+
+        in_v = inp.streams.video[0]
+        in_v.thread_type = "AUTO"
+        # Same per-encoder rules as the ffmpeg command line (VP9/AV1 b:v 0,
+        # maxrate/bufsize, AV1 cpu-used, tune, x26x threading)
+        profile = ENCODER_PROFILES.get(v_encoder, EncoderProfile())
+        options = flags_to_codec_options(
+            profile.preset_flags(preset)
+            + profile.tune_flags(tune)
+            + profile.encoder_flags(threads=threads)
+            + profile.quality_flags(crf, v_bitrate)
+        )
+
+        # Same muxer flags as the ffmpeg command line
+        with av.open(str(dst), "w", options={"movflags": "use_metadata_tags+faststart"}) as out:
+            out.metadata.update(inp.metadata)
+            out_v = out.add_stream(v_encoder, rate=in_v.average_rate, options=options)
+            out_v.width, out_v.height = crop_w, crop_h
+            out_v.pix_fmt = in_v.codec_context.pix_fmt
+            out_v.time_base = in_v.time_base
+
+            # add_stream(template=) was superseded in PyAV 13
+            from_template = getattr(out, "add_stream_from_template", None)
+            copies = {}
+            for s in inp.streams.audio:
+                out_a = from_template(s) if from_template else out.add_stream(template=s)
+                # Templates carry codec parameters only; keep language/title
+                # tags and default/forced flags like ffmpeg's stream copy does
+                out_a.metadata.update(s.metadata)
+                if hasattr(s, "disposition"):
+                    out_a.disposition = s.disposition
+                copies[s.index] = out_a
+
+            graph = av.filter.Graph()
+            graph.link_nodes(
+                graph.add_buffer(template=in_v),
+                graph.add("crop", f"{crop_w}:{crop_h}:{x}:{y}"),
+                graph.add("buffersink"),
+            ).configure()
+
+            def drain():
+                while True:
+                    try:
+                        frame = graph.pull()
+                    except (BlockingIOError, EOFError):
+                        return
+                    out.mux(out_v.encode(frame))
+
+            for packet in inp.demux():
+                if packet.stream.index in copies:
+                    if packet.dts is None:
+                        continue
+                    packet.stream = copies[packet.stream.index]
+                    out.mux(packet)
+                    continue
+                for frame in packet.decode():
+                    graph.push(frame)
+                    drain()
+
+            # Flush the filter graph, then the encoder
+            graph.push(None)
+            drain()
+            out.mux(out_v.encode(None))
+    return True
+
+def run_encode(cmd, parallel, src):
+    """
+    Run an ffmpeg encode. In parallel mode ffmpeg runs quietly (commands are
+    built with QUIET_LOG_FLAGS) and a one-line summary is printed on success,
+    so concurrent jobs don't interleave on the terminal.
+    """
+    rc, out, err = run_live_capture(cmd, quiet=parallel)
+    if parallel and rc == 0:
+        speed = parse_progress(out).get("speed")
+        print(f":: Done: {src}" + (f" (speed {speed})" if speed else ""))
+    return rc, out, err
+
+def probe_input(src):
+    """
+    Stat and probe one input ahead of encoding.
+    Returns (src, info, error); info and error are both None for a missing file.
+    """
+    try:
+        # ffprobe_json_video's os.stat doubles as the existence check
+        return src, ffprobe_json_video(src), None
+    except (FileNotFoundError, NotADirectoryError):
+        # e.g. "file.mkv/x": missing, as the old Path.exists() check had it
+        return src, None, None
+    except (OSError, ValueError, RuntimeError) as e:
+        # PermissionError, unparseable ffprobe JSON, ...: fail this file only
+        return src, None, str(e)
+
+def process_one(src, info, args, outdir):
+    """
+    Crop and encode a single input already probed by probe_input().
+    Returns (src, returncode, captured_stderr); skipped inputs count as success.
+    """
+    parallel = args.jobs > 1
+    srcp = Path(src)
+    v = get_video_stream(info)
+    if v is None:
+        print(f"!! No video stream in: {src}", file=sys.stderr)
+        return src, 0, ""
+
+    iw = parse_int(v.get("width"))
+    ih = parse_int(v.get("height"))
+    codec_name = v.get("codec_name")
+    # Prefer stream-level bitrate; fall back to container if needed
+    v_bitrate = parse_int(v.get("bit_rate"))
+    if v_bitrate is None:
+        v_bitrate = parse_int(info.get("format", {}).get("bit_rate"))
+    # A touch of safety: clamp absurdly low/zero bitrates
+    if v_bitrate is not None and v_bitrate < 100_000:
+        v_bitrate = None
+
+    if iw is None or ih is None:
+        print(f"!! Could not read dimensions for: {src}", file=sys.stderr)
+        return src, 0, ""
+
+    src_aspect = iw / ih if ih else 0.0
+
+    # Decide crop
+    crop = None
+    if args.use_cropdetect and is_analytic_crop_safe(iw, ih):
+        print(f":: {src} is {iw}x{ih}; skipping cropdetect in favour of a centered 4:3 crop.")
+    elif args.use_cropdetect:
+        # Don't seek past the end of short clips
+        duration = parse_float(info.get("format", {}).get("duration"))
+        start = args.cropdetect_skip if duration is None or duration > args.cropdetect_skip else 0
+        c = run_cropdetect(srcp, seconds=args.scan_seconds, start=start)
+        if c:
+            cw, ch, cx, cy = c
+            # if crop is extremely close to 4:3, nudge width to exact 4:3 for clean result
+            if abs((cw / ch) - (4/3)) < 0.01:
+                cw = even(int(round(ch * 4 / 3)))
+                cx = even((iw - cw) // 2)
+            crop = (cw, ch, cx, cy)
+
+    # Fallback: centered 4:3 if the input is wider than 4:3 (pillarboxed)
+    if crop is None and src_aspect > (4/3) + 0.005:
+        crop = centered_4x3_crop(iw, ih)
+
+    # even()-rounding can leave a "crop" that keeps the whole frame
+    if crop is not None and is_noop_crop(crop, iw, ih):
+        crop = None
+
+    if crop is None:
+        print(f":: {src} already ~4:3 (aspect {src_aspect:.3f}); copying without video re-encode.")
+        dst = output_path_for(srcp, outdir)
+        # Just stream copy everything if no crop needed
+        cmd = build_copy_cmd(srcp, dst, quiet=parallel)
+        print("$", " ".join(shlex.quote(x) for x in cmd))
+        if args.dry_run:
+            return src, 0, ""
+        rc, out, err = run_encode(cmd, parallel, src)
+        return src, rc, err
+
+    bsf = None
+    if args.bitstream_crop:
+        wants_encode = args.crf is not None or args.two_pass or args.hwaccel != "none" or args.pyav
+        if wants_encode:
+            print(f"!! Note: --bitstream-crop ignored for {src}; an encode option was given.", file=sys.stderr)
+        else:
+            bsf = bitstream_crop_filter(codec_name, crop, iw, ih)
+    if bsf is not None:
+        # Block-aligned crop: the decoder applies it from the SPS, no re-encode
+        print(f":: {src} crop is {BITSTREAM_CROP_UNIT[codec_name]}-px aligned; cropping losslessly via {bsf.split('=')[0]}.")
+        dst = output_path_for(srcp, outdir)
+        cmd = build_copy_cmd(srcp, dst, video_bsf=bsf, quiet=parallel)
+        print("$", " ".join(shlex.quote(x) for x in cmd))
+        if args.dry_run:
+            return src, 0, ""
+        rc, out, err = run_encode(cmd, parallel, src)
+        return src, rc, err
+
+    # Choose encoder based on source codec
+    if args.crf is not None:
+        v_bitrate = None
+    v_encoder, accel = choose_encoder(
+        codec_name or "", args.hwaccel, constant_quality=v_bitrate is None,
+    )
+    if v_encoder in ("libx264", "libx265") and v.get("pix_fmt", "").endswith("10le"):
+        print(f"!! Note: Input appears 10-bit ({v.get('pix_fmt')}). "
+              f"Your distro's {v_encoder} may be 8-bit only; ffmpeg could downconvert.",
+              file=sys.stderr)
+
+    dst = output_path_for(srcp, outdir)
+    encode_args = dict(
+        src=srcp,
+        dst=dst,
+        crop=crop,
+        v_encoder=v_encoder,
+        v_bitrate=v_bitrate,
+        crf=args.crf,
+        preset=args.preset,
+        tune=args.tune,
+        threads=args.encode_threads or max(1, (os.cpu_count() or 4) // args.jobs),
+        accel=accel,
+        src_codec=codec_name,
+        src_size=(iw, ih),
+        quiet=parallel,
+    )
+
+    profile = ENCODER_PROFILES.get(v_encoder, EncoderProfile())
+    if args.two_pass and (v_bitrate is None or not profile.supports_two_pass):
+        print(f"!! Note: --two-pass needs a bitrate target and a software encoder; "
+              f"encoding {src} in one pass.", file=sys.stderr)
+    elif args.two_pass:
+        # Stats file lives in a per-task temp dir so concurrent jobs don't clash
+        with tempfile.TemporaryDirectory(prefix="pillarbox-2pass-") as tmp:
+            passlogfile = os.path.join(tmp, "ffmpeg2pass")
+            # Both passes must share the preset: x264/x265 reject a stats file
+            # written with different weightp/bframes/mbtree settings. x264
+            # already speeds up pass 1 itself (slow-firstpass is off).
+            pass1 = build_ffmpeg_cmd(**encode_args, pass_num=1, passlogfile=passlogfile)
+            pass2 = build_ffmpeg_cmd(**encode_args, pass_num=2, passlogfile=passlogfile)
+            print("$", " ".join(shlex.quote(x) for x in pass1))
+            print("$", " ".join(shlex.quote(x) for x in pass2))
+            if args.dry_run:
+                return src, 0, ""
+            rc, out, err = run_live_capture(pass1, quiet=parallel)
+            if rc != 0:
+                return src, rc, err
+            rc, out, err = run_encode(pass2, parallel, src)
+            return src, rc, err
+
+    # PyAV can't copy chapters; those inputs stay on ffmpeg to keep them
+    if args.pyav and accel == "cpu" and not args.dry_run and not info.get("chapters"):
+        print(f":: Encoding {src} in-process with PyAV ({v_encoder}, crop={':'.join(map(str, crop))})")
+        try:
+            done = encode_with_pyav(
+                srcp, dst, crop, v_encoder,
+                v_bitrate=v_bitrate, crf=args.crf, preset=args.preset, tune=args.tune,
+                threads=encode_args["threads"],
+            )
+        except Exception as e:
+            # Don't leave a truncated file where a finished output would be
+            if os.path.exists(dst):
+                os.remove(dst)
+            return src, 1, f"PyAV encode failed: {e}"
+        if done:
+            if parallel:
+                print(f":: Done: {src}")
+            return src, 0, ""
+        print(f":: {src} has streams PyAV can't copy; using ffmpeg instead.")
+
+    cmd = build_ffmpeg_cmd(**encode_args)
+
+    print("$", " ".join(shlex.quote(x) for x in cmd))
+    if args.dry_run:
+        return src, 0, ""
+    rc, out, err = run_encode(cmd, parallel, src)
+    return src, rc, err
+
 def main():
     ap = argparse.ArgumentParser(description="Crop pillarboxed 16:9 to true 4:3 with stream copies.")
     ap.add_argument("inputs", nargs="+", help="Input video file(s)")
     ap.add_argument("-o", "--output", help="Output directory")
     ap.add_argument("--use-cropdetect", action="store_true", help="Use ffmpeg cropdetect to find exact crop")
     ap.add_argument("--scan-seconds", type=int, default=15, help="Seconds to scan for cropdetect (default 15)")
+    ap.add_argument("--cropdetect-skip", type=float, default=10,
+                    help="Seconds to skip before the cropdetect scan, past logos/intros (default 10)")
     ap.add_argument("--crf", type=int, help="Use CRF mode instead of bitrate parity (e.g. 18).")
-    ap.add_argument("--preset", default="medium", help="ffmpeg encoder preset (default: medium)")
+    # 'faster' measures ~70% quicker than 'medium' for x264 with differences
+    # that are hard to see at matched bitrate/CRF (Streaming Learning Center
+    # preset comparisons). Same default for x265; pass --preset medium to
+    # get the old behaviour back.
+    ap.add_argument("--preset", default="faster", help="ffmpeg encoder preset (default: faster)")
+    ap.add_argument("--bitstream-crop", action="store_true",
+                    help="Crop block-aligned H.264/HEVC losslessly via SPS cropping instead of re-encoding "
+                         "(container keeps the original size; some players stretch)")
+    ap.add_argument("--two-pass", action="store_true",
+                    help="Two-pass encode in bitrate mode (better quality for the same size)")
+    ap.add_argument("--pyav", action="store_true",
+                    help="Encode in-process with PyAV when installed (video+audio inputs without chapters; others use ffmpeg)")
+    ap.add_argument("--tune", help="x264/x265 -tune value, e.g. ssim, film, animation (ignored by other encoders)")
     ap.add_argument("--dry-run", action="store_true", help="Print commands without running")
+    ap.add_argument("--encode-threads", type=int,
+                    help="Threads per encoder (default: CPU count divided by --jobs)")
+    ap.add_argument("--hwaccel", choices=("none", "cuda", "qsv", "videotoolbox", "auto"), default="none",
+                    help="Use GPU decode/encode when ffmpeg supports it; falls back to software (default: none)")
+    ap.add_argument("-j", "--jobs", type=int, default=1,
+                    help="Number of files to process concurrently (default: 1)")
     args = ap.parse_args()
 
     if shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None:
         print("Error: ffmpeg/ffprobe not found in PATH.", file=sys.stderr)
         sys.exit(1)
 
-    outdir = args.output
-    if outdir:
-        Path(outdir).mkdir(parents=True, exist_ok=True)
-
-    for src in args.inputs:
-        srcp = Path(src)
-        if not srcp.exists():
-            print(f"!! Skipping missing file: {src}", file=sys.stderr)
-            continue
+    if args.jobs < 1:
+        ap.error("--jobs must be at least 1")
+    if args.pyav and av is None:
+        print("!! Note: --pyav given but PyAV isn't installed; using ffmpeg.", file=sys.stderr)
+        args.pyav = False
+    if args.encode_threads is not None and args.encode_threads < 1:
+        ap.error("--encode-threads must be at least 1")
 
-        info = ffprobe_json(srcp)
-        v = get_video_stream(info)
-        if v is None:
-            print(f"!! No video stream in: {src}", file=sys.stderr)
-            continue
+    # Resolve the output directory once for the whole batch
+    outdir = None
+    if args.output:
+        outdir_p = Path(args.output).resolve()
+        outdir_p.mkdir(parents=True, exist_ok=True)
+        outdir = str(outdir_p)
 
-        iw = parse_int(v.get("width"))
-        ih = parse_int(v.get("height"))
-        codec_name = v.get("codec_name")
-        # Prefer stream-level bitrate; fall back to container if needed
-        v_bitrate = parse_int(v.get("bit_rate"))
-        if v_bitrate is None:
-            v_bitrate = parse_int(info.get("format", {}).get("bit_rate"))
-        # A touch of safety: clamp absurdly low/zero bitrates
-        if v_bitrate is not None and v_bitrate < 100_000:
-            v_bitrate = None
-
-        if iw is None or ih is None:
-            print(f"!! Could not read dimensions for: {src}", file=sys.stderr)
-            continue
+    # Probe ffmpeg's codec lists once up front rather than racing to do it
+    # from every worker
+    _ffmpeg_codecs("encoders")
+    if args.hwaccel in ("cuda", "auto"):
+        _ffmpeg_codecs("decoders")
 
-        src_aspect = iw / ih if ih else 0.0
+    # Pre-flight: stat + ffprobe every input concurrently. This is I/O bound
+    # (and dominated by latency on network shares), so plenty of threads
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        metas = list(executor.map(probe_input, args.inputs))
 
-        # Decide crop
-        crop = None
-        if args.use_cropdetect:
-            c = run_cropdetect(srcp, seconds=args.scan_seconds)
-            if c:
-                cw, ch, cx, cy = c
-                # if crop is extremely close to 4:3, nudge width to exact 4:3 for clean result
-                if abs((cw / ch) - (4/3)) < 0.01:
-                    cw = even(int(round(ch * 4 / 3)))
-                    cx = even((iw - cw) // 2)
-                crop = (cw, ch, cx, cy)
-
-        if crop is None:
-            # Fallback: centered 4:3 if the input is wider than 4:3 (pillarboxed)
-            if src_aspect > (4/3) + 0.005:
-                crop = centered_4x3_crop(iw, ih)
-            else:
-                print(f":: {src} already ~4:3 (aspect {src_aspect:.3f}); copying without video re-encode.")
-                dst = output_path_for(srcp, outdir)
-                # Just stream copy everything if no crop needed
-                cmd = [
-                    "ffmpeg", "-stats", "-loglevel", "level+info", "-y", "-i", str(srcp),
-                    "-map", "0", "-map_metadata", "0", "-map_chapters", "0",
-                    "-c", "copy", "-movflags", "use_metadata_tags+faststart",
-                    str(dst)
-                ]
-                print("$", " ".join(shlex.quote(x) for x in cmd))
-                if not args.dry_run:
-                    rc, out, err = run_live_capture(cmd)
-                    if rc != 0:
-                        print(err, file=sys.stderr)
-                        sys.exit(rc)
-                continue
-
-        # Choose encoder based on source codec
-        v_encoder = choose_encoder(codec_name or "")
-        if v_encoder in ("libx264", "libx265") and v.get("pix_fmt", "").endswith("10le"):
-            print(f"!! Note: Input appears 10-bit ({v.get('pix_fmt')}). "
-                  f"Your distro's {v_encoder} may be 8-bit only; ffmpeg could downconvert.",
-                  file=sys.stderr)
-
-        dst = output_path_for(srcp, outdir)
-        cmd = build_ffmpeg_cmd(
-            src=srcp,
-            dst=dst,
-            crop=crop,
-            v_encoder=v_encoder,
-            v_bitrate=v_bitrate if args.crf is None else None,
-            crf=args.crf,
-            preset=args.preset,
-        )
+    failures = []
+    todo = []
+    for src, info, err in metas:
+        if err is not None:
+            print(f"!! Failed (probe): {src}\n{err}", file=sys.stderr)
+            failures.append(src)
+        elif info is None:
+            print(f"!! Skipping missing file: {src}", file=sys.stderr)
+        else:
+            todo.append((src, info))
 
-        print("$", " ".join(shlex.quote(x) for x in cmd))
-        if not args.dry_run:
-            rc, out, err = run_live_capture(cmd)
+    executor = ThreadPoolExecutor(max_workers=args.jobs)
+    try:
+        futures = [executor.submit(process_one, src, info, args, outdir) for src, info in todo]
+        for fut in as_completed(futures):
+            src, rc, err = fut.result()
             if rc != 0:
-                print(err, file=sys.stderr)
-                sys.exit(rc)
+                print(f"!! Failed ({rc}): {src}\n{err}", file=sys.stderr)
+                failures.append(src)
+    except KeyboardInterrupt:
+        # Ctrl-C already reached the running ffmpeg(s); drop the queued files
+        # instead of letting shutdown(wait=True) start them one by one
+        executor.shutdown(wait=False, cancel_futures=True)
+        print("\n!! Interrupted.", file=sys.stderr)
+        sys.exit(130)
+    executor.shutdown()
+
+    if failures:
+        # One bad file doesn't stop the rest of the batch; report at the end
+        print(f"!! {len(failures)} of {len(args.inputs)} file(s) failed.", file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -1,15 +1,160 @@
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, ttk
 import subprocess
+import threading
 import os
+from collections import deque
+
+# One decode feeds palette generation, the final paletteuse pass, a null
+# output that reports progress and, when asked for, the WebM preview (at the
+# same reduced size and frame rate; -2 keeps the height even for the yuv420p
+# encoder)
+def gif_filter(with_preview=False):
+    branches = "split=4[s0][s1][prog][webm]" if with_preview else "split=3[s0][s1][prog]"
+    return (
+        f"[0:v]fps=10,scale=320:-2:flags=lanczos,{branches};"
+        "[s0]palettegen=max_colors=128[p];"
+        "[s1][p]paletteuse=dither=bayer:bayer_scale=5[gif]"
+    )
+
+# The conversion in flight, if any (only one at a time)
+current = {"running": False, "proc": None, "cancelled": False, "outputs": ()}
+
+def build_command(filepath, output_path, webm_path=None):
+    command = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        # Machine-readable key=value progress on stdout instead of the stats line
+        "-progress", "pipe:1", "-nostats",
+        "-i", filepath,
+        "-filter_complex", gif_filter(with_preview=bool(webm_path)),
+        "-map", "[gif]", "-loop", "0", output_path,
+        # palettegen only emits at EOF, so the GIF output alone would leave
+        # out_time_ms at N/A until the very end; this one keeps pace
+        "-map", "[prog]", "-f", "null", "-",
+    ]
+    if webm_path:
+        # Second output from the same decoded, scaled frames; realtime VP9
+        # settings keep the preview from taking longer than the GIF itself
+        command += [
+            "-map", "[webm]", "-an", "-c:v", "libvpx-vp9", "-crf", "34", "-b:v", "0",
+            "-deadline", "realtime", "-cpu-used", "8", "-row-mt", "1", webm_path,
+        ]
+    return command
+
+def probe_duration_us(filepath):
+    command = ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+               "-of", "default=noprint_wrappers=1:nokey=1", filepath]
+    try:
+        out = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout
+        return float(out.strip()) * 1_000_000
+    except (OSError, ValueError):
+        return None
+
+def set_progress(value):
+    root.after(0, lambda: progressbar.configure(value=value))
+
+def finish():
+    current["running"] = False
+    current["proc"] = None
+    cancel_button.configure(state=tk.DISABLED)
+    progressbar.configure(value=0)
+
+def remove_outputs(*paths):
+    for path in paths:
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # closing the window may race the worker thread here
+
+def convert(filepath, output_path, webm_path=None):
+    duration_us = probe_duration_us(filepath)
+    command = build_command(filepath, output_path, webm_path)
+    # Tk isn't thread-safe: results are handed back to the main loop
+    if current["cancelled"]:
+        # Cancel was clicked while probing; don't start ffmpeg at all
+        root.after(0, finish)
+        root.after(0, lambda: messagebox.showinfo("Cancelled", "Conversion cancelled."))
+        return
+    try:
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, shell=False)
+    except OSError as e:
+        root.after(0, finish)
+        root.after(0, lambda: messagebox.showerror("Error", f"Could not run ffmpeg: {e}"))
+        return
+    current["proc"] = proc
+    if current["cancelled"]:
+        # Cancel landed between the check above and proc being published
+        proc.terminate()
+
+    # Drain stderr alongside stdout: a damaged file can log enough decode
+    # errors to fill the pipe and stall ffmpeg. Only the tail is kept.
+    err_tail = deque(maxlen=20)
+    err_thread = threading.Thread(target=err_tail.extend, args=(proc.stderr,), daemon=True)
+    err_thread.start()
+
+    for line in proc.stdout:
+        key, _, value = line.strip().partition("=")
+        # Despite the name, out_time_ms is in microseconds
+        if key == "out_time_ms" and duration_us:
+            try:
+                set_progress(min(100.0, int(value) / duration_us * 100))
+            except ValueError:
+                pass  # "N/A" before the first frame
+    proc.wait()
+    err_thread.join()
+
+    root.after(0, finish)
+    if current["cancelled"]:
+        remove_outputs(output_path, webm_path)
+        root.after(0, lambda: messagebox.showinfo("Cancelled", "Conversion cancelled."))
+    elif proc.returncode == 0:
+        saved = f"{output_path} and {webm_path}" if webm_path else output_path
+        root.after(0, lambda: messagebox.showinfo("Success", f"File converted and saved as {saved}"))
+    else:
+        msg = [ln.strip() for ln in err_tail if ln.strip()][-1:] or ["unknown error"]
+        root.after(0, lambda: messagebox.showerror("Error", f"ffmpeg failed: {msg[0]}"))
+
+def cancel():
+    if not current["running"]:
+        return
+    # Also covers a click before ffmpeg has started (convert checks the flag)
+    current["cancelled"] = True
+    proc = current["proc"]
+    if proc is not None and proc.poll() is None:
+        proc.terminate()
+
+def close():
+    # The worker is a daemon thread but ffmpeg isn't: stop it and clear its
+    # half-written files rather than leave it running after the window goes
+    if current["running"]:
+        current["cancelled"] = True
+        proc = current["proc"]
+        if proc is not None and proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        remove_outputs(*current["outputs"])
+    root.destroy()
 
 def drop(event):
-    filepath = event.data
-    if filepath.endswith(('.mp4', '.mkv', '.avi')):
-        output_path = os.path.splitext(filepath)[0] + '.gif'
-        command = f'ffmpeg -i "{filepath}" -vf "fps=10,scale=320:-1:flags=lanczos" "{output_path}"'
-        subprocess.run(command, shell=True)
-        messagebox.showinfo("Success", f"File converted and saved as {output_path}")
+    # Paths with spaces arrive wrapped in braces
+    filepath = event.data.strip("{}")
+    if current["running"]:
+        messagebox.showerror("Error", "A conversion is already running.")
+    elif not os.path.isfile(filepath):
+        messagebox.showerror("Error", f"Not a file: {filepath}")
+    elif filepath.endswith(('.mp4', '.mkv', '.avi')):
+        base = os.path.splitext(filepath)[0]
+        output_path = base + '.gif'
+        webm_path = base + '.preview.webm' if webm_var.get() else None
+        current.update(running=True, cancelled=False, outputs=(output_path, webm_path))
+        cancel_button.configure(state=tk.NORMAL)
+        # Encode off the UI thread so the window stays responsive
+        threading.Thread(target=convert, args=(filepath, output_path, webm_path), daemon=True).start()
     else:
         messagebox.showerror("Error", "File type not supported. Please drop a .mp4, .mkv, or .avi file.")
 
@@ -19,7 +164,17 @@ root.title("Video to GIF converter")
 label = tk.Label(root, text="Drag and drop a video file here")
 label.pack(padx=10, pady=10)
 
+webm_var = tk.BooleanVar(value=False)
+tk.Checkbutton(root, text="Also save a WebM preview", variable=webm_var).pack(padx=10, pady=(0, 10))
+
+progressbar = ttk.Progressbar(root, length=300, maximum=100, mode="determinate")
+progressbar.pack(padx=10, pady=(0, 10))
+
+cancel_button = tk.Button(root, text="Cancel", command=cancel, state=tk.DISABLED)
+cancel_button.pack(padx=10, pady=(0, 10))
+
 root.drop_target_register(tk.DND_FILES)
 root.dnd_bind('<<Drop>>', drop)
+root.protocol("WM_DELETE_WINDOW", close)
 
 root.mainloop()